@@ -1,12 +1,18 @@
 import functools
 import signal
-from asyncio import get_running_loop, ensure_future
+import time
+from asyncio import get_running_loop, Task
 from typing import Any, Callable, Awaitable
 
 from confluent_kafka import Consumer, KafkaException, Message  # type: ignore
 from loguru import logger
 from pydantic import BaseModel
 
+# Offsets are committed in batches instead of after every message, to avoid a
+# synchronous broker round-trip per record
+COMMIT_BATCH_SIZE = 500
+COMMIT_INTERVAL_SECONDS = 5.0
+
 
 class KafkaConsumerConfig(BaseModel):
     brokers: str
@@ -17,6 +23,26 @@ class KafkaConsumerConfig(BaseModel):
     authentication_mechanism: str
     kafka_security_enabled: bool
     consumer_poll_timeout: int
+    consumer_batch_size: int
+    consumer_fetch_wait_max_ms: int
+    consumer_fetch_min_bytes: int
+
+    class Config:
+        frozen = True
+
+
+async def _safe_process(
+    msg_process: Callable[[Message], Awaitable[None]], msg: Message
+) -> None:
+    # Messages are processed in background tasks, so failures have to be logged here
+    # instead of surfacing as never retrieved task exceptions
+    try:
+        await msg_process(msg)
+    except Exception as process_error:
+        logger.exception(
+            "Failed process message"
+            f" from topic {msg.topic()}, partition {msg.partition()}, offset {msg.offset()}: {str(process_error)}"
+        )
 
 
 class KafkaConsumer:
@@ -27,11 +53,19 @@ class KafkaConsumer:
         org_id: str,
     ) -> None:
         self.running = False
+        self._closed = False
         self._assigned_partitions = False
         self.org_id = org_id
         self.config = config
+        self.topics = [f"{self.org_id}.change.log"]
 
         self.msg_process = msg_process
+        # The event loop only keeps weak references to tasks, so we hold on to the
+        # in-flight message handlers until they are done to avoid them being garbage
+        # collected mid-execution.
+        self._processing_tasks: set[Task[None]] = set()
+        self._uncommitted_messages = 0
+        self._last_commit_time = time.monotonic()
         if config.kafka_security_enabled:
             kafka_config = {
                 "bootstrap.servers": config.brokers,
@@ -46,16 +80,35 @@ class KafkaConsumer:
                 # can be assigned to a partition at a time and we dont want a running instance to lose its partitions
                 # when a new instance starts and causes a rebalance.
                 "partition.assignment.strategy": "cooperative-sticky",
+                **self._fetch_config(config),
             }
         else:
             kafka_config = {
                 "bootstrap.servers": config.brokers,
                 "group.id": "no-security",
                 "enable.auto.commit": "false",
+                **self._fetch_config(config),
             }
 
         self.consumer = Consumer(kafka_config)
 
+    @staticmethod
+    def _fetch_config(config: KafkaConsumerConfig) -> dict[str, Any]:
+        # The broker answers a fetch request once either fetch.min.bytes are available
+        # or fetch.wait.max.ms has passed. The consumer poll timeout should be longer
+        # than this window, otherwise the consume call returns before the broker had
+        # the chance to batch the messages.
+        if config.consumer_poll_timeout * 1000 < config.consumer_fetch_wait_max_ms:
+            logger.warning(
+                f"The consumer poll timeout ({config.consumer_poll_timeout}s) is shorter than"
+                f" the fetch wait time ({config.consumer_fetch_wait_max_ms}ms), which reduces"
+                " the batching of consumed messages"
+            )
+        return {
+            "fetch.wait.max.ms": config.consumer_fetch_wait_max_ms,
+            "fetch.min.bytes": config.consumer_fetch_min_bytes,
+        }
+
     def _handle_partitions_assignment(self, _: Any, partitions: list[str]) -> None:
         logger.info(f"Assigned partitions: {partitions}")
         if not partitions and not self._assigned_partitions:
@@ -69,43 +122,59 @@ class KafkaConsumer:
         else:
             self._assigned_partitions = True
 
+    def _commit(self, asynchronous: bool) -> None:
+        self.consumer.commit(asynchronous=asynchronous)
+        self._uncommitted_messages = 0
+        self._last_commit_time = time.monotonic()
+
+    def _commit_if_needed(self) -> None:
+        if not self._uncommitted_messages:
+            return
+
+        if (
+            self._uncommitted_messages >= COMMIT_BATCH_SIZE
+            or time.monotonic() - self._last_commit_time > COMMIT_INTERVAL_SECONDS
+        ):
+            self._commit(asynchronous=True)
+
     async def start(self) -> None:
         self.running = True
         logger.info("Starting kafka consumer...")
-        topics = [f"{self.org_id}.change.log"]
         self.consumer.subscribe(
-            topics,
+            self.topics,
             on_assign=self._handle_partitions_assignment,
         )
-        logger.info(f"Subscribed to topics: {topics}")
+        logger.info(f"Subscribed to topics: {self.topics}")
 
         loop = get_running_loop()
-        poll = functools.partial(
-            self.consumer.poll, timeout=self.config.consumer_poll_timeout
+        consume = functools.partial(
+            self.consumer.consume,
+            num_messages=self.config.consumer_batch_size,
+            timeout=self.config.consumer_poll_timeout,
         )
         try:
             while self.running:
                 try:
-                    msg = await loop.run_in_executor(None, poll)
-                    if msg is None:
-                        continue
-                    if msg.error():
-                        raise KafkaException(msg.error())
-                    else:
-                        try:
-                            logger.info(
-                                "Process message "
-                                f"from topic {msg.topic()}, partition {msg.partition()}, offset {msg.offset()}"
-                            )
-                            ensure_future(self.msg_process(msg))
-
-                        except Exception as process_error:
-                            logger.exception(
-                                "Failed process message"
-                                f" from topic {msg.topic()}, partition {msg.partition()}, offset {msg.offset()}: {str(process_error)}"
-                            )
-                        finally:
-                            self.consumer.commit(asynchronous=False)
+                    msgs = await loop.run_in_executor(None, consume)
+                    for msg in msgs:
+                        if msg.error():
+                            logger.error(str(KafkaException(msg.error())))
+                            continue
+                        # Lazy formatting avoids calling into the message on every
+                        # record when the log level is disabled
+                        logger.opt(lazy=True).info(
+                            "Process message from topic {}, partition {}, offset {}",
+                            msg.topic,
+                            msg.partition,
+                            msg.offset,
+                        )
+                        # Handler failures are logged by _safe_process
+                        task = loop.create_task(_safe_process(self.msg_process, msg))
+                        self._processing_tasks.add(task)
+                        task.add_done_callback(self._processing_tasks.discard)
+                        self._uncommitted_messages += 1
+                    # Offsets are committed once per consumed batch at most
+                    self._commit_if_needed()
                 except Exception as message_error:
                     logger.error(str(message_error))
         finally:
@@ -113,6 +182,19 @@ class KafkaConsumer:
             self.exit_gracefully()
 
     def exit_gracefully(self, *_: Any) -> None:
-        logger.info("Closing the kafka consumer gracefully...")
+        # The consumer is stopped both by the event listener and by the consume loop
+        # that exits as a result, but it can only be committed and closed once
         self.running = False
+        if self._closed:
+            return
+        self._closed = True
+        logger.info("Closing the kafka consumer gracefully...")
+        if self._uncommitted_messages:
+            # A final synchronous commit covers the messages dispatched since the last
+            # batched commit. Their handlers run in the background and may still be in
+            # flight, so this does not guarantee they were processed.
+            try:
+                self._commit(asynchronous=False)
+            except KafkaException as commit_error:
+                logger.error(f"Failed to commit offsets on shutdown: {commit_error}")
         self.consumer.close()
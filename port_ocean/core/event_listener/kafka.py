@@ -1,9 +1,15 @@
 import asyncio
-import json
 import sys
 from asyncio import ensure_future, Task
 from typing import Any, Literal
 
+try:
+    # orjson parses the raw message bytes directly and is considerably faster than
+    # the stdlib json module on the hot path of the consumer
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 from confluent_kafka import Message  # type: ignore
 from loguru import logger
 
@@ -35,6 +41,12 @@ class KafkaEventListenerSettings(EventListenerSettings):
                                        The default value is True.
         consumer_poll_timeout (int): The maximum time in seconds to wait for messages during a poll.
                                      The default value is 1 second.
+        consumer_batch_size (int): The maximum number of messages to fetch from Kafka in a single consume call.
+                                   The default value is 500.
+        consumer_fetch_wait_max_ms (int): The maximum time in milliseconds the broker waits to fill a fetch response.
+                                          Should be shorter than the poll timeout. The default value is 500 milliseconds.
+        consumer_fetch_min_bytes (int): The minimum amount of data in bytes the broker returns for a fetch request.
+                                        The default value is 1 byte.
     """
 
     type: Literal["KAFKA"]
@@ -45,6 +57,9 @@ class KafkaEventListenerSettings(EventListenerSettings):
     authentication_mechanism: str = "SCRAM-SHA-512"
     kafka_security_enabled: bool = True
     consumer_poll_timeout: int = 1
+    consumer_batch_size: int = 500
+    consumer_fetch_wait_max_ms: int = 500
+    consumer_fetch_min_bytes: int = 1
 
 
 class KafkaEventListener(BaseEventListener):
@@ -118,7 +133,7 @@ class KafkaEventListener(BaseEventListener):
         Spawning a thread to handle the message allows the Kafka consumer to continue polling for new messages.
         Using wrap_method_with_context ensures that the thread has access to the current context.
         """
-        message = json.loads(raw_msg.value().decode())
+        message = json_loads(raw_msg.value())
         topic = raw_msg.topic()
 
         if not self._should_be_processed(message, topic):
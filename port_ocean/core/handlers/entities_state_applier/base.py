@@ -1,4 +1,5 @@
 from abc import abstractmethod
+from typing import Iterable
 
 from port_ocean.clients.port.types import UserAgentType
 from port_ocean.core.handlers.base import BaseHandler
@@ -46,12 +47,12 @@ class BaseEntitiesStateApplier(BaseHandler):
 
     @abstractmethod
     async def upsert(
-        self, entities: list[Entity], user_agent_type: UserAgentType
+        self, entities: Iterable[Entity], user_agent_type: UserAgentType
     ) -> list[Entity]:
         """Upsert (insert or update) the given entities into the state.
 
         Args:
-            entities (list[Entity]): The entities to be upserted.
+            entities (Iterable[Entity]): The entities to be upserted.
             user_agent_type (UserAgentType): The user agent responsible for the upsert.
 
         Returns:
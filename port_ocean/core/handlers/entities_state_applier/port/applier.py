@@ -1,3 +1,6 @@
+import itertools
+from typing import Iterable
+
 from loguru import logger
 
 from port_ocean.clients.port.types import UserAgentType
@@ -6,14 +9,14 @@ from port_ocean.core.handlers.entities_state_applier.base import (
     BaseEntitiesStateApplier,
 )
 from port_ocean.core.handlers.entities_state_applier.port.get_related_entities import (
-    get_related_entities,
+    get_related_entities_refs,
 )
 from port_ocean.core.handlers.entities_state_applier.port.order_by_entities_dependencies import (
-    order_by_entities_dependencies,
+    group_by_entities_dependencies,
 )
 from port_ocean.core.models import Entity
 from port_ocean.core.ocean_types import EntityDiff
-from port_ocean.core.utils import is_same_entity, get_port_diff
+from port_ocean.core.utils import get_port_diff
 
 
 class HttpEntitiesStateApplier(BaseEntitiesStateApplier):
@@ -33,22 +36,29 @@ class HttpEntitiesStateApplier(BaseEntitiesStateApplier):
         if not entities_to_delete:
             return
 
-        related_entities = await get_related_entities(
+        # With nothing to protect every entity is allowed to be deleted, so there is no
+        # need to calculate the related entities and protected keys
+        if not entities_to_protect:
+            return await self.delete(entities_to_delete, user_agent_type)
+
+        related_entities_keys = await get_related_entities_refs(
             entities_to_protect, self.context.port_client
         )
+        protected_entities_keys = {
+            (entity.identifier, entity.blueprint) for entity in entities_to_protect
+        }
 
+        create_missing_related_entities = (
+            event.port_app_config.create_missing_related_entities
+        )
         allowed_entities_to_delete = []
 
         for entity_to_delete in entities_to_delete:
-            is_part_of_related = any(
-                is_same_entity(entity, entity_to_delete) for entity in related_entities
-            )
-            is_part_of_created = any(
-                is_same_entity(entity, entity_to_delete)
-                for entity in entities_to_protect
-            )
+            entity_key = (entity_to_delete.identifier, entity_to_delete.blueprint)
+            is_part_of_related = entity_key in related_entities_keys
+            is_part_of_created = entity_key in protected_entities_keys
             if is_part_of_related:
-                if event.port_app_config.create_missing_related_entities:
+                if create_missing_related_entities:
                     logger.info(
                         f"Skipping entity {(entity_to_delete.identifier, entity_to_delete.blueprint)} because it is "
                         f"related to created entities and create_missing_related_entities is enabled"
@@ -66,12 +76,13 @@ class HttpEntitiesStateApplier(BaseEntitiesStateApplier):
         user_agent_type: UserAgentType,
     ) -> None:
         diff = get_port_diff(entities["before"], entities["after"])
-        kept_entities = diff.created + diff.modified
 
         logger.info(
             f"Updating entity diff (created: {len(diff.created)}, deleted: {len(diff.deleted)}, modified: {len(diff.modified)})"
         )
-        modified_entities = await self.upsert(kept_entities, user_agent_type)
+        modified_entities = await self.upsert(
+            itertools.chain(diff.created, diff.modified), user_agent_type
+        )
 
         await self._safe_delete(diff.deleted, modified_entities, user_agent_type)
 
@@ -94,14 +105,16 @@ class HttpEntitiesStateApplier(BaseEntitiesStateApplier):
         await self._safe_delete(diff.deleted, kept_entities, user_agent_type)
 
     async def upsert(
-        self, entities: list[Entity], user_agent_type: UserAgentType
+        self, entities: Iterable[Entity], user_agent_type: UserAgentType
     ) -> list[Entity]:
-        logger.info(f"Upserting {len(entities)} entities")
+        request_options = event.port_app_config.get_port_request_options()
         modified_entities: list[Entity] = []
-        if event.port_app_config.create_missing_related_entities:
+        if request_options["create_missing_related_entities"]:
+            entities = list(entities)
+            logger.info(f"Upserting {len(entities)} entities")
             modified_entities = await self.context.port_client.batch_upsert_entities(
                 entities,
-                event.port_app_config.get_port_request_options(),
+                request_options,
                 user_agent_type,
                 should_raise=False,
             )
@@ -114,39 +127,46 @@ class HttpEntitiesStateApplier(BaseEntitiesStateApplier):
                 else:
                     entities_without_search_identifier.append(entity)
 
-            ordered_created_entities = reversed(
-                entities_with_search_identifier
-                + order_by_entities_dependencies(entities_without_search_identifier)
+            logger.info(
+                f"Upserting {len(entities_with_search_identifier) + len(entities_without_search_identifier)} entities"
             )
-            for entity in ordered_created_entities:
-                upsertedEntity = await self.context.port_client.upsert_entity(
-                    entity,
-                    event.port_app_config.get_port_request_options(),
-                    user_agent_type,
-                    should_raise=False,
+
+            # Entities with a search identifier can't be placed in the dependency graph,
+            # so each of them is upserted on its own after the ordered levels
+            ordered_created_levels = itertools.chain(
+                reversed(
+                    group_by_entities_dependencies(entities_without_search_identifier)
+                ),
+                ([entity] for entity in reversed(entities_with_search_identifier)),
+            )
+            for level in ordered_created_levels:
+                modified_entities.extend(
+                    await self.context.port_client.batch_upsert_entities(
+                        level,
+                        request_options,
+                        user_agent_type,
+                        should_raise=False,
+                    )
                 )
-                if upsertedEntity:
-                    modified_entities.append(upsertedEntity)
         return modified_entities
 
     async def delete(
         self, entities: list[Entity], user_agent_type: UserAgentType
     ) -> None:
         logger.info(f"Deleting {len(entities)} entities")
-        if event.port_app_config.delete_dependent_entities:
+        request_options = event.port_app_config.get_port_request_options()
+        if request_options["delete_dependent_entities"]:
             await self.context.port_client.batch_delete_entities(
                 entities,
-                event.port_app_config.get_port_request_options(),
+                request_options,
                 user_agent_type,
                 should_raise=False,
             )
         else:
-            ordered_deleted_entities = order_by_entities_dependencies(entities)
-
-            for entity in ordered_deleted_entities:
-                await self.context.port_client.delete_entity(
-                    entity,
-                    event.port_app_config.get_port_request_options(),
+            for level in group_by_entities_dependencies(entities):
+                await self.context.port_client.batch_delete_entities(
+                    level,
+                    request_options,
                     user_agent_type,
                     should_raise=False,
                 )
@@ -6,9 +6,9 @@ from port_ocean.clients.port.client import PortClient
 from port_ocean.core.models import Entity
 
 
-async def get_related_entities(
+async def get_related_entities_refs(
     entities: list[Entity], port_client: PortClient
-) -> list[Entity]:
+) -> set[tuple[str, str]]:
     entities_with_relations = [entity for entity in entities if entity.relations]
     blueprint_identifier_to_entity = dict(
         groupby(
@@ -42,10 +42,11 @@ async def get_related_entities(
                 relation if isinstance(relation, list) else [relation]
             )
 
-    return [
-        Entity(identifier=relation, blueprint=blueprint)
+    # The related entities are only used for membership checks, so we return their
+    # (identifier, blueprint) refs directly instead of constructing Entity objects.
+    # Being a set, multiple entities pointing to the same relation are deduplicated.
+    return {
+        (relation, blueprint)
         for blueprint, relations in blueprints_to_relations.items()
-        # multiple entities can point to the same relation in the same blueprint, for performance reasons
-        # we want to avoid fetching the same relation multiple times
-        for relation in set(relations)
-    ]
+        for relation in relations
+    }
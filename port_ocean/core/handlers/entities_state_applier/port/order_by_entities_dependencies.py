@@ -1,5 +1,6 @@
+from collections import defaultdict
 from graphlib import TopologicalSorter, CycleError
-from typing import Set
+from typing import Any, Set
 
 from port_ocean.core.models import Entity
 from port_ocean.exceptions.core import OceanAbortException
@@ -11,36 +12,56 @@ def node(entity: Entity) -> Node:
     return entity.identifier, entity.blueprint
 
 
-def order_by_entities_dependencies(entities: list[Entity]) -> list[Entity]:
+def group_by_entities_dependencies(entities: list[Entity]) -> list[list[Entity]]:
+    """Group the entities into levels of the dependency graph.
+
+    Each level only depends on the levels before it, so the entities inside a level
+    are independent of each other and can be handled concurrently.
+    """
     nodes: dict[Node, Set[Node]] = {}
     entities_map = {}
+    # Relations point to entities by identifier only, so we index the nodes by their
+    # identifier to resolve every relation with a lookup instead of scanning all the
+    # entities for each one of them
+    identifier_to_nodes: dict[Any, list[Node]] = defaultdict(list)
+    # The node of every entity is calculated once and reused for the graph edges
+    entities_with_nodes = [(entity, node(entity)) for entity in entities]
 
-    for entity in entities:
-        nodes[node(entity)] = set()
-        entities_map[node(entity)] = entity
+    for entity, entity_node in entities_with_nodes:
+        nodes[entity_node] = set()
+        entities_map[entity_node] = entity
+        identifier_to_nodes[entity.identifier].append(entity_node)
 
-    for entity in entities:
-        relation_target_ids: list[str] = sum(
-            [
+    for entity, entity_node in entities_with_nodes:
+        for identifiers in entity.relations.values():
+            if identifiers is None:
+                continue
+            for identifier in (
                 identifiers if isinstance(identifiers, list) else [identifiers]
-                for identifiers in entity.relations.values()
-                if identifiers is not None
-            ],
-            [],
-        )
-        related_entities = [
-            related for related in entities if related.identifier in relation_target_ids
-        ]
-
-        for related_entity in related_entities:
-            nodes[node(entity)].add(node(related_entity))
+            ):
+                # Search relations can't match any of the entities identifiers
+                if isinstance(identifier, dict):
+                    continue
+                nodes[entity_node].update(identifier_to_nodes.get(identifier, []))
 
     sort_op = TopologicalSorter(nodes)
+    levels: list[list[Entity]] = []
     try:
-        return [entities_map[item] for item in sort_op.static_order()]
+        sort_op.prepare()
+        while sort_op.is_active():
+            ready_nodes = sort_op.get_ready()
+            levels.append([entities_map[item] for item in ready_nodes])
+            sort_op.done(*ready_nodes)
     except CycleError as ex:
         raise OceanAbortException(
             "Cannot order entities due to cyclic dependencies. \n"
             "If you do want to have cyclic dependencies, please make sure to set the keys"
             " 'createMissingRelatedEntities' and 'deleteDependentEntities' in the integration config in Port."
         ) from ex
+    return levels
+
+
+def order_by_entities_dependencies(entities: list[Entity]) -> list[Entity]:
+    return [
+        entity for level in group_by_entities_dependencies(entities) for entity in level
+    ]
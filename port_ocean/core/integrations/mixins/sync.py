@@ -40,10 +40,7 @@ class SyncMixin(HandlerMixin):
         Raises:
             IntegrationNotStartedException: If EntitiesStateApplier class is not initialized.
         """
-        await self.entities_state_applier.apply_diff(
-            {"before": desired_state["before"], "after": desired_state["after"]},
-            user_agent_type,
-        )
+        await self.entities_state_applier.apply_diff(desired_state, user_agent_type)
 
     async def register(
         self,
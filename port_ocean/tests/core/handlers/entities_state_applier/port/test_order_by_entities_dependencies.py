@@ -0,0 +1,71 @@
+import pytest
+
+from port_ocean.core.handlers.entities_state_applier.port.order_by_entities_dependencies import (
+    group_by_entities_dependencies,
+    order_by_entities_dependencies,
+)
+from port_ocean.core.models import Entity
+from port_ocean.exceptions.core import OceanAbortException
+
+
+def _keys(entities: list[Entity]) -> list[tuple[str, str]]:
+    return [(entity.identifier, entity.blueprint) for entity in entities]
+
+
+def test_group_by_entities_dependencies_groups_independent_entities() -> None:
+    service = Entity(
+        identifier="service", blueprint="service", relations={"team": "team"}
+    )
+    other_service = Entity(
+        identifier="other-service", blueprint="service", relations={"team": "team"}
+    )
+    team = Entity(identifier="team", blueprint="team", relations={"org": ["org"]})
+    org = Entity(identifier="org", blueprint="org")
+
+    levels = group_by_entities_dependencies([service, other_service, team, org])
+
+    assert [sorted(_keys(level)) for level in levels] == [
+        [("org", "org")],
+        [("team", "team")],
+        [("other-service", "service"), ("service", "service")],
+    ]
+
+
+def test_order_by_entities_dependencies_flattens_levels() -> None:
+    service = Entity(
+        identifier="service", blueprint="service", relations={"team": "team"}
+    )
+    team = Entity(identifier="team", blueprint="team", relations={"org": None})
+
+    assert _keys(order_by_entities_dependencies([service, team])) == [
+        ("team", "team"),
+        ("service", "service"),
+    ]
+
+
+def test_group_by_entities_dependencies_raises_on_cycle() -> None:
+    first = Entity(identifier="first", blueprint="node", relations={"next": "second"})
+    second = Entity(identifier="second", blueprint="node", relations={"next": "first"})
+
+    with pytest.raises(OceanAbortException):
+        group_by_entities_dependencies([first, second])
+
+
+def test_group_by_entities_dependencies_ignores_unknown_relations() -> None:
+    service = Entity(
+        identifier="service",
+        blueprint="service",
+        relations={
+            "team": "missing-team",
+            "owner": {"combinator": "and", "rules": []},
+            "repos": ["repo", None],
+        },
+    )
+    repo = Entity(identifier="repo", blueprint="repo")
+
+    levels = group_by_entities_dependencies([service, repo])
+
+    assert [_keys(level) for level in levels] == [
+        [("repo", "repo")],
+        [("service", "service")],
+    ]